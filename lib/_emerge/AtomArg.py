@@ -1,14 +1,55 @@
 # Copyright 1999-2012 Gentoo Foundation
 # Distributed under the terms of the GNU General Public License v2
 
-from portage._sets.base import InternalPackageSet
 from _emerge.DependencyArg import DependencyArg
 
 
+class _SingleAtomPackageSet:
+    """
+    Lightweight stand-in for InternalPackageSet covering the read-only
+    surface that consumers of AtomArg.pset actually use. The pset of an
+    AtomArg always contains exactly one atom, so a full PackageSet with
+    its container and atom-map bookkeeping is unnecessary.
+    """
+
+    __slots__ = ("_atom",)
+
+    def __init__(self, atom):
+        self._atom = atom
+
+    def __iter__(self):
+        yield self._atom
+
+    def __contains__(self, atom):
+        return atom == self._atom
+
+    def __bool__(self):
+        return True
+
+    def getAtoms(self):
+        return {self._atom}
+
+    def getNonAtoms(self):
+        return set()
+
+
 class AtomArg(DependencyArg):
-    __slots__ = ("atom", "pset")
+    __slots__ = ("atom", "_pset")
 
     def __init__(self, atom=None, **kwargs):
         DependencyArg.__init__(self, **kwargs)
         self.atom = atom
-        self.pset = InternalPackageSet(initial_atoms=(self.atom,), allow_repo=True)
+        self._pset = None
+
+    @property
+    def pset(self):
+        """
+        Construct the single-atom set on first access, since many
+        AtomArg instances are created and discarded without pset
+        ever being consulted.
+        """
+        pset = self._pset
+        if pset is None:
+            pset = _SingleAtomPackageSet(self.atom)
+            self._pset = pset
+        return pset
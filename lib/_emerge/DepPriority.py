@@ -1,8 +1,93 @@
 # Copyright 1999-2023 Gentoo Authors
 # Distributed under the terms of the GNU General Public License v2
 
+import functools
+
 from _emerge.AbstractDepPriority import AbstractDepPriority
 
+_FLAG_NAMES = (
+    "buildtime",
+    "buildtime_slot_op",
+    "cross",
+    "ignored",
+    "installtime",
+    "optional",
+    "runtime",
+    "runtime_post",
+    "runtime_slot_op",
+    "satisfied",
+)
+
+
+@functools.lru_cache(maxsize=128)
+def _repr_for(flags):
+    """
+    Format a repr for the given flag combination. Instances are
+    effectively immutable flag-bags with only a few dozen distinct
+    states, so the formatted strings are memoized by flag tuple.
+    """
+    enabled = ", ".join(name for name, value in zip(_FLAG_NAMES, flags) if value)
+    return f"DepPriority({enabled})"
+
+
+def _build_tables():
+    """
+    Precompute lookup tables for __int__ and __str__ over every
+    combination of the relevant boolean attributes, so that each
+    call reduces to computing a bit index and a single tuple
+    subscript instead of walking a ladder of attribute tests.
+    """
+    int_table = []
+    str_table = []
+    for idx in range(128):
+        ignored = bool(idx & 64)
+        optional = bool(idx & 32)
+        buildtime_slot_op = bool(idx & 16)
+        buildtime = bool(idx & 8)
+        runtime_slot_op = bool(idx & 4)
+        runtime = bool(idx & 2)
+        runtime_post = bool(idx & 1)
+
+        if optional:
+            hardness = -5
+        elif buildtime_slot_op:
+            hardness = 0
+        elif buildtime:
+            hardness = -1
+        elif runtime_slot_op:
+            hardness = -2
+        elif runtime:
+            hardness = -3
+        elif runtime_post:
+            hardness = -4
+        else:
+            hardness = -6
+        if idx < 64:
+            int_table.append(hardness)
+
+        if ignored:
+            name = "ignored"
+        elif optional:
+            name = "optional"
+        elif buildtime_slot_op:
+            name = "buildtime_slot_op"
+        elif buildtime:
+            name = "buildtime"
+        elif runtime_slot_op:
+            name = "runtime_slot_op"
+        elif runtime:
+            name = "runtime"
+        elif runtime_post:
+            name = "runtime_post"
+        else:
+            name = "soft"
+        str_table.append(name)
+
+    return tuple(int_table), tuple(str_table)
+
+
+_INT_TABLE, _STR_TABLE = _build_tables()
+
 
 class DepPriority(AbstractDepPriority):
     __slots__ = ("cross", "ignored", "optional", "satisfied")
@@ -27,33 +112,25 @@ class DepPriority(AbstractDepPriority):
 
         """
 
-        if self.optional:
-            return -5
-        if self.buildtime_slot_op:
-            return 0
-        if self.buildtime:
-            return -1
-        if self.runtime_slot_op:
-            return -2
-        if self.runtime:
-            return -3
-        if self.runtime_post:
-            return -4
-        return -6
+        return _INT_TABLE[
+            (bool(self.optional) << 5)
+            | (bool(self.buildtime_slot_op) << 4)
+            | (bool(self.buildtime) << 3)
+            | (bool(self.runtime_slot_op) << 2)
+            | (bool(self.runtime) << 1)
+            | bool(self.runtime_post)
+        ]
+
+    def __repr__(self):
+        return _repr_for(tuple(bool(getattr(self, name)) for name in _FLAG_NAMES))
 
     def __str__(self):
-        if self.ignored:
-            return "ignored"
-        if self.optional:
-            return "optional"
-        if self.buildtime_slot_op:
-            return "buildtime_slot_op"
-        if self.buildtime:
-            return "buildtime"
-        if self.runtime_slot_op:
-            return "runtime_slot_op"
-        if self.runtime:
-            return "runtime"
-        if self.runtime_post:
-            return "runtime_post"
-        return "soft"
+        return _STR_TABLE[
+            (bool(self.ignored) << 6)
+            | (bool(self.optional) << 5)
+            | (bool(self.buildtime_slot_op) << 4)
+            | (bool(self.buildtime) << 3)
+            | (bool(self.runtime_slot_op) << 2)
+            | (bool(self.runtime) << 1)
+            | bool(self.runtime_post)
+        ]
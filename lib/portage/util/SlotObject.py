@@ -1,12 +1,18 @@
 # Copyright 1999-2012 Gentoo Foundation
 # Distributed under the terms of the GNU General Public License v2
 
+# Cache of slot attributes per class, since walking the class
+# hierarchy on every instantiation is measurably expensive for
+# frequently constructed objects. Maps each class to a tuple of
+# (attribute name, defining class name) pairs in traversal order.
+_slot_attrs_cache = {}
 
-class SlotObject:
-    __slots__ = ("__weakref__",)
 
-    def __init__(self, **kwargs):
-        classes = [self.__class__]
+def _slot_attrs(cls):
+    attrs = _slot_attrs_cache.get(cls)
+    if attrs is None:
+        attr_list = []
+        classes = [cls]
         while classes:
             c = classes.pop()
             if c is SlotObject:
@@ -16,22 +22,33 @@ class SlotObject:
             if not slots:
                 continue
             for myattr in slots:
-                myvalue = kwargs.pop(myattr, None)
-                if myvalue is None and getattr(self, myattr, None) is not None:
-                    raise AssertionError(
-                        "class '%s' duplicates '%s' value in __slots__ of base class '%s'"
-                        % (self.__class__.__name__, myattr, c.__name__)
-                    )
-                try:
-                    setattr(self, myattr, myvalue)
-                except AttributeError:
-                    # Allow a property to override a __slots__ value, but raise an
-                    # error if the intended value is something other than None.
-                    if not (
-                        myvalue is None
-                        and isinstance(getattr(type(self), myattr, None), property)
-                    ):
-                        raise
+                attr_list.append((myattr, c.__name__))
+        attrs = tuple(attr_list)
+        _slot_attrs_cache[cls] = attrs
+    return attrs
+
+
+class SlotObject:
+    __slots__ = ("__weakref__",)
+
+    def __init__(self, **kwargs):
+        for myattr, base_name in _slot_attrs(self.__class__):
+            myvalue = kwargs.pop(myattr, None)
+            if myvalue is None and getattr(self, myattr, None) is not None:
+                raise AssertionError(
+                    "class '%s' duplicates '%s' value in __slots__ of base class '%s'"
+                    % (self.__class__.__name__, myattr, base_name)
+                )
+            try:
+                setattr(self, myattr, myvalue)
+            except AttributeError:
+                # Allow a property to override a __slots__ value, but raise an
+                # error if the intended value is something other than None.
+                if not (
+                    myvalue is None
+                    and isinstance(getattr(type(self), myattr, None), property)
+                ):
+                    raise
 
         if kwargs:
             raise TypeError(
@@ -47,16 +64,7 @@ class SlotObject:
         """
         obj = self.__class__()
 
-        classes = [self.__class__]
-        while classes:
-            c = classes.pop()
-            if c is SlotObject:
-                continue
-            classes.extend(c.__bases__)
-            slots = getattr(c, "__slots__", None)
-            if not slots:
-                continue
-            for myattr in slots:
-                setattr(obj, myattr, getattr(self, myattr))
+        for myattr, _base_name in _slot_attrs(self.__class__):
+            setattr(obj, myattr, getattr(self, myattr))
 
         return obj
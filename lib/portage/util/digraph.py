@@ -20,6 +20,12 @@ class digraph:
         # { node : ( { child : priority } , { parent : priority } ) }
         self.nodes = {}
         self.order = []
+        # Incrementally maintained sets of nodes without children
+        # (leaves) and without parents (roots), so the common
+        # unfiltered leaf_nodes()/root_nodes() queries avoid a scan
+        # of every edge in the graph.
+        self._leaves = set()
+        self._roots = set()
 
     def add(self, node, parent, priority=0):
         """Adds the specified node with the specified parent.
@@ -27,22 +33,33 @@ class digraph:
         If the dep is a soft-dep and the node already has a hard
         relationship to the parent, the relationship is left as hard."""
 
-        if node not in self.nodes:
-            self.nodes[node] = ({}, {}, node)
+        nodes = self.nodes
+        node_entry = nodes.get(node)
+        if node_entry is None:
+            node_entry = ({}, {}, node)
+            nodes[node] = node_entry
             self.order.append(node)
+            self._leaves.add(node)
+            self._roots.add(node)
 
         if not parent:
             return
 
-        if parent not in self.nodes:
-            self.nodes[parent] = ({}, {}, parent)
+        parent_entry = nodes.get(parent)
+        if parent_entry is None:
+            parent_entry = ({}, {}, parent)
+            nodes[parent] = parent_entry
             self.order.append(parent)
+            self._leaves.add(parent)
+            self._roots.add(parent)
 
-        priorities = self.nodes[node][1].get(parent)
+        priorities = node_entry[1].get(parent)
         if priorities is None:
             priorities = []
-            self.nodes[node][1][parent] = priorities
-            self.nodes[parent][0][node] = priorities
+            node_entry[1][parent] = priorities
+            parent_entry[0][node] = priorities
+            self._roots.discard(node)
+            self._leaves.discard(parent)
 
         if not priorities or priorities[-1] is not priority:
             bisect.insort(priorities, priority)
@@ -67,16 +84,32 @@ class digraph:
 
         for parent in self.nodes[node][1]:
             del self.nodes[parent][0][node]
+            if parent is not node and not self.nodes[parent][0]:
+                self._leaves.add(parent)
         for child in self.nodes[node][0]:
             del self.nodes[child][1][node]
+            if child is not node and not self.nodes[child][1]:
+                self._roots.add(child)
 
         del self.nodes[node]
         self.order.remove(node)
+        self._leaves.discard(node)
+        self._roots.discard(node)
 
     def update(self, other):
         """
         Add all nodes and edges from another digraph instance.
         """
+        if not self.nodes:
+            # Merging into an empty graph is a plain copy, so skip
+            # the per-priority add() calls and take the containers
+            # from a clone directly.
+            clone = other.clone()
+            self.nodes = clone.nodes
+            self.order = clone.order
+            self._leaves = clone._leaves
+            self._roots = clone._roots
+            return
         for node in other.order:
             children, parents, node = other.nodes[node]
             if parents:
@@ -92,34 +125,47 @@ class digraph:
         """
         self.nodes.clear()
         del self.order[:]
+        self._leaves.clear()
+        self._roots.clear()
 
     def difference_update(self, t):
         """
         Remove all given nodes from node_set. This is more efficient
         than multiple calls to the remove() method.
         """
-        if isinstance(t, (list, tuple)) or not hasattr(t, "__contains__"):
+        if not isinstance(t, (set, frozenset, dict)):
             t = frozenset(t)
+        nodes = self.nodes
+        leaves = self._leaves
+        roots = self._roots
         order = []
+        order_append = order.append
         for node in self.order:
             if node not in t:
-                order.append(node)
+                order_append(node)
                 continue
-            for parent in self.nodes[node][1]:
-                del self.nodes[parent][0][node]
-            for child in self.nodes[node][0]:
-                del self.nodes[child][1][node]
-            del self.nodes[node]
+            children, parents, _node = nodes[node]
+            for parent in parents:
+                parent_children = nodes[parent][0]
+                del parent_children[node]
+                if parent is not node and not parent_children:
+                    leaves.add(parent)
+            for child in children:
+                child_parents = nodes[child][1]
+                del child_parents[node]
+                if child is not node and not child_parents:
+                    roots.add(child)
+            del nodes[node]
+            leaves.discard(node)
+            roots.discard(node)
         self.order = order
 
     def has_edge(self, child, parent):
         """
         Return True if the given edge exists.
         """
-        try:
-            return child in self.nodes[parent][0]
-        except KeyError:
-            return False
+        parent_entry = self.nodes.get(parent)
+        return parent_entry is not None and child in parent_entry[0]
 
     def remove_edge(self, child, parent):
         """
@@ -142,6 +188,10 @@ class digraph:
         # Remove the edge.
         del self.nodes[child][1][parent]
         del self.nodes[parent][0][child]
+        if not self.nodes[parent][0]:
+            self._leaves.add(parent)
+        if not self.nodes[child][1]:
+            self._roots.add(child)
 
     def __iter__(self):
         return iter(self.order)
@@ -162,34 +212,36 @@ class digraph:
 
     def child_nodes(self, node, ignore_priority=None):
         """Return all children of the specified node"""
+        children_map = self.nodes[node][0]
         if ignore_priority is None:
-            return list(self.nodes[node][0])
+            return list(children_map)
         children = []
         if hasattr(ignore_priority, "__call__"):
-            for child, priorities in self.nodes[node][0].items():
+            for child, priorities in children_map.items():
                 for priority in reversed(priorities):
                     if not ignore_priority(priority):
                         children.append(child)
                         break
         else:
-            for child, priorities in self.nodes[node][0].items():
+            for child, priorities in children_map.items():
                 if ignore_priority < priorities[-1]:
                     children.append(child)
         return children
 
     def parent_nodes(self, node, ignore_priority=None):
         """Return all parents of the specified node"""
+        parents_map = self.nodes[node][1]
         if ignore_priority is None:
-            return list(self.nodes[node][1])
+            return list(parents_map)
         parents = []
         if hasattr(ignore_priority, "__call__"):
-            for parent, priorities in self.nodes[node][1].items():
+            for parent, priorities in parents_map.items():
                 for priority in reversed(priorities):
                     if not ignore_priority(priority):
                         parents.append(parent)
                         break
         else:
-            for parent, priorities in self.nodes[node][1].items():
+            for parent, priorities in parents_map.items():
                 if ignore_priority < priorities[-1]:
                     parents.append(parent)
         return parents
@@ -200,15 +252,17 @@ class digraph:
         If ignore_soft_deps is True, soft deps are not counted as
         children in calculations."""
 
+        nodes = self.nodes
         leaf_nodes = []
         if ignore_priority is None:
+            leaves = self._leaves
             for node in self.order:
-                if not self.nodes[node][0]:
+                if node in leaves:
                     leaf_nodes.append(node)
         elif hasattr(ignore_priority, "__call__"):
             for node in self.order:
                 is_leaf_node = True
-                for child, priorities in self.nodes[node][0].items():
+                for child, priorities in nodes[node][0].items():
                     for priority in reversed(priorities):
                         if not ignore_priority(priority):
                             is_leaf_node = False
@@ -220,7 +274,7 @@ class digraph:
         else:
             for node in self.order:
                 is_leaf_node = True
-                for child, priorities in self.nodes[node][0].items():
+                for child, priorities in nodes[node][0].items():
                     if ignore_priority < priorities[-1]:
                         is_leaf_node = False
                         break
@@ -234,15 +288,17 @@ class digraph:
         If ignore_soft_deps is True, soft deps are not counted as
         parents in calculations."""
 
+        nodes = self.nodes
         root_nodes = []
         if ignore_priority is None:
+            roots = self._roots
             for node in self.order:
-                if not self.nodes[node][1]:
+                if node in roots:
                     root_nodes.append(node)
         elif hasattr(ignore_priority, "__call__"):
             for node in self.order:
                 is_root_node = True
-                for parent, priorities in self.nodes[node][1].items():
+                for parent, priorities in nodes[node][1].items():
                     for priority in reversed(priorities):
                         if not ignore_priority(priority):
                             is_root_node = False
@@ -254,7 +310,7 @@ class digraph:
         else:
             for node in self.order:
                 is_root_node = True
-                for parent, priorities in self.nodes[node][1].items():
+                for parent, priorities in nodes[node][1].items():
                     if ignore_priority < priorities[-1]:
                         is_root_node = False
                         break
@@ -290,6 +346,8 @@ class digraph:
                 parents_clone[parent] = priorities_clone
             clone.nodes[node] = (children_clone, parents_clone, node)
         clone.order = self.order[:]
+        clone._leaves = self._leaves.copy()
+        clone._roots = self._roots.copy()
         return clone
 
     def delnode(self, node):
@@ -299,12 +357,15 @@ class digraph:
             pass
 
     def firstzero(self):
-        leaf_nodes = self.leaf_nodes()
-        if leaf_nodes:
-            return leaf_nodes[0]
+        leaves = self._leaves
+        for node in self.order:
+            if node in leaves:
+                return node
         return None
 
     def hasallzeros(self, ignore_priority=None):
+        if ignore_priority is None:
+            return len(self._leaves) == len(self.order)
         return len(self.leaf_nodes(ignore_priority=ignore_priority)) == len(self.order)
 
     def debug_print(self):
@@ -321,37 +382,113 @@ class digraph:
                 output(f"  {child} ({priorities[-1]})\n")
 
     def bfs(self, start, ignore_priority=None):
-        if start not in self:
+        if start not in self.nodes:
             raise KeyError(start)
 
+        nodes = self.nodes
+        child_nodes = self.child_nodes
         queue, enqueued = deque([(None, start)]), {start}
+        enqueued_add = enqueued.add
         while queue:
             parent, n = queue.popleft()
             yield parent, n
-            new = set(self.child_nodes(n, ignore_priority)) - enqueued
-            enqueued |= new
-            queue.extend([(n, child) for child in new])
+            if ignore_priority is None:
+                # Iterate the child dict directly instead of
+                # materializing a list through child_nodes().
+                children = nodes[n][0]
+            else:
+                children = child_nodes(n, ignore_priority)
+            for child in children:
+                if child not in enqueued:
+                    enqueued_add(child)
+                    queue.append((n, child))
 
     def shortest_path(self, start, end, ignore_priority=None):
-        if start not in self:
+        if start not in self.nodes:
             raise KeyError(start)
-        elif end not in self:
+        elif end not in self.nodes:
             raise KeyError(end)
 
-        paths = {None: []}
+        prev = {}
         for parent, child in self.bfs(start, ignore_priority):
-            paths[child] = paths[parent] + [child]
+            prev[child] = parent
             if child == end:
-                return paths[child]
+                path = []
+                while child is not None:
+                    path.append(child)
+                    child = prev[child]
+                path.reverse()
+                return path
         return None
 
+    def _cycle_candidates(self, ignore_priority=None):
+        """
+        Return the set of nodes that can participate in a cycle: the
+        members of strongly connected components of size greater than
+        one, plus nodes with an edge to themselves. Uses an iterative
+        Tarjan SCC traversal, O(V+E) in total.
+        """
+        child_nodes = self.child_nodes
+        index = {}
+        lowlink = {}
+        scc_stack = []
+        on_stack = set()
+        candidates = set()
+        next_index = 0
+        for root in self.nodes:
+            if root in index:
+                continue
+            work = [(root, None)]
+            while work:
+                node, children = work[-1]
+                if children is None:
+                    index[node] = lowlink[node] = next_index
+                    next_index += 1
+                    scc_stack.append(node)
+                    on_stack.add(node)
+                    children = iter(child_nodes(node, ignore_priority))
+                    work[-1] = (node, children)
+                advanced = False
+                for child in children:
+                    if child == node:
+                        # A self-edge forms a cycle of length one.
+                        candidates.add(node)
+                    elif child not in index:
+                        work.append((child, None))
+                        advanced = True
+                        break
+                    elif child in on_stack and index[child] < lowlink[node]:
+                        lowlink[node] = index[child]
+                if not advanced:
+                    work.pop()
+                    if lowlink[node] == index[node]:
+                        scc = []
+                        while True:
+                            n = scc_stack.pop()
+                            on_stack.discard(n)
+                            scc.append(n)
+                            if n == node:
+                                break
+                        if len(scc) > 1:
+                            candidates.update(scc)
+                    elif work and lowlink[node] < lowlink[work[-1][0]]:
+                        lowlink[work[-1][0]] = lowlink[node]
+        return candidates
+
     def get_cycles(self, ignore_priority=None, max_length=None):
         """
         Returns all cycles that have at most length 'max_length'.
         If 'max_length' is 'None', all cycles are returned.
         """
+        # Nodes outside a strongly connected component cannot be part
+        # of any cycle, so skip the shortest-path searches for them.
+        # This keeps the quadratic work below proportional to the
+        # cyclic portion of the graph, which is usually tiny.
+        cycle_candidates = self._cycle_candidates(ignore_priority)
         all_cycles = []
         for node in self.nodes:
+            if node not in cycle_candidates:
+                continue
             # If we have multiple paths of the same length, we have to
             # return them all, so that we always get the same results
             # even with PYTHONHASHSEED="random" enabled.